@@ -0,0 +1,34 @@
+from django.core.cache import cache
+
+from api.constants import TAGS_CACHE_KEY, TAGS_CACHE_TIMEOUT
+from recipes.models import Tag
+
+
+def get_tags_dict():
+    """Возвращает словарь всех тегов вида {id: {'id', 'name', 'slug'}}.
+
+    Кэш по умолчанию (LocMemCache) свой в каждом процессе, а сигналы Tag
+    очищают его только в процессе, где изменили тег. Остальные процессы
+    увидят изменения не позже чем через TAGS_CACHE_TIMEOUT секунд.
+    """
+    tags = cache.get(TAGS_CACHE_KEY)
+    if tags is None:
+        tags = {
+            tag.id: {'id': tag.id, 'name': tag.name, 'slug': tag.slug}
+            for tag in Tag.objects.only('id', 'name', 'slug')
+        }
+        cache.set(TAGS_CACHE_KEY, tags, TAGS_CACHE_TIMEOUT)
+    return tags
+
+
+def clear_tags_cache():
+    cache.delete(TAGS_CACHE_KEY)
+
+
+def get_tags_by_ids(tag_ids):
+    """Возвращает данные тегов в порядке переданных id."""
+    tags = get_tags_dict()
+    if any(tag_id not in tags for tag_id in tag_ids):
+        clear_tags_cache()
+        tags = get_tags_dict()
+    return [tags[tag_id] for tag_id in tag_ids]
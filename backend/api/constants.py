@@ -1,13 +1,19 @@
 AMOUNT_MIN_VALUE = 1
+BASE64_DECODE_CHUNK_SIZE = 64 * 1024
 COOKING_TIME_MIN_VALUE = 1
 CUSTOMUSER_MAX_LENGTH = 150
+IMAGE_SPOOL_MAX_SIZE = 1024 * 1024
 INGREDIENT_NAME_MAX_LENGTH = 128
 INGREDIENT_UNIT_MAX_LENGTH = 64
+PAGINATION_COUNT_CACHE_TIMEOUT = 30
 PAGINATION_MAX_PAGE_SIZE = 100
 PAGINATION_PAGE_SIZE = 6
 RECIPE_MAX_LENGTH = 256
 RECIPES_LIMIT_DEFAULT = 3
 RECIPES_LIMIT_MIN_VALUE = 1
+SHOPPING_LIST_CHUNK_SIZE = 500
+SHORT_CODE_MAX_ATTEMPTS = 5
 TAG_MAX_LENGTH = 32
+TAGS_CACHE_KEY = 'tags-dict'
+TAGS_CACHE_TIMEOUT = 60
 UNIQUE_ID_LENGTH = 8
-USERNAME_REGEX = r'^[\w.@+-]+$'
@@ -0,0 +1,88 @@
+import binascii
+import re
+from tempfile import SpooledTemporaryFile
+
+import filetype
+import pybase64
+from django.core.files.uploadedfile import UploadedFile
+from drf_extra_fields import fields
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import ImageField
+
+from api.constants import BASE64_DECODE_CHUNK_SIZE, IMAGE_SPOOL_MAX_SIZE
+
+DATA_URI_PATTERN = re.compile(r'data:([^;,]*);base64,')
+
+
+class Base64ImageField(fields.Base64ImageField):
+    """Поле изображения в base64 с декодированием через pybase64.
+
+    Данные декодируются частями во временный файл, который остаётся в памяти
+    до IMAGE_SPOOL_MAX_SIZE байт и затем сбрасывается на диск.
+    """
+
+    def decode_to_file(self, base64_data, offset=0):
+        decoded_file = SpooledTemporaryFile(max_size=IMAGE_SPOOL_MAX_SIZE)
+        try:
+            for start in range(
+                offset, len(base64_data), BASE64_DECODE_CHUNK_SIZE
+            ):
+                decoded_file.write(pybase64.b64decode(
+                    base64_data[start:start + BASE64_DECODE_CHUNK_SIZE],
+                    validate=True
+                ))
+        except binascii.Error:
+            decoded_file.seek(0)
+            decoded_file.truncate()
+            decoded_file.write(
+                pybase64.b64decode(base64_data[offset:], validate=False)
+            )
+        decoded_file.seek(0)
+        return decoded_file
+
+    def to_internal_value(self, base64_data):
+        if base64_data in self.EMPTY_VALUES or not isinstance(
+            base64_data, str
+        ):
+            return super().to_internal_value(base64_data)
+
+        file_mime_type = None
+        offset = 0
+        data_uri = DATA_URI_PATTERN.match(base64_data)
+        if data_uri:
+            offset = data_uri.end()
+            if self.trust_provided_content_type:
+                file_mime_type = data_uri.group(1)
+
+        try:
+            decoded_file = self.decode_to_file(base64_data, offset)
+        except (TypeError, binascii.Error, ValueError):
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+
+        file_name = self.get_file_name(decoded_file)
+        file_extension = self.get_file_extension(file_name, decoded_file)
+        if file_extension not in self.ALLOWED_TYPES:
+            raise ValidationError(self.INVALID_TYPE_MESSAGE)
+
+        decoded_file.seek(0, 2)
+        size = decoded_file.tell()
+        decoded_file.seek(0)
+        data = UploadedFile(
+            file=decoded_file,
+            name=f'{file_name}.{file_extension}',
+            content_type=file_mime_type,
+            size=size
+        )
+        return ImageField.to_internal_value(self, data)
+
+    def get_file_extension(self, filename, decoded_file):
+        extension = filetype.guess_extension(decoded_file)
+        if extension is None:
+            try:
+                extension = Image.open(decoded_file).format.lower()
+            except OSError:
+                raise ValidationError(self.INVALID_FILE_MESSAGE)
+            finally:
+                decoded_file.seek(0)
+        return 'jpg' if extension == 'jpeg' else extension
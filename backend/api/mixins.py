@@ -0,0 +1,58 @@
+from copy import copy, deepcopy
+
+from django.db.models import Exists, OuterRef
+from rest_framework.fields import DictField, ListField
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import BaseSerializer
+
+from recipes.models import Favorite, ShoppingCart
+
+NESTED_FIELD_CLASSES = (BaseSerializer, DictField, ListField, ManyRelatedField)
+
+
+class CachedFieldsSerializerMixin:
+    """Строит набор полей сериализатора один раз на класс.
+
+    Вложенные сериализаторы и поля с дочерним полем копируются глубоко,
+    остальные поля - поверхностно.
+    """
+
+    _fields_cache = {}
+
+    def get_fields(self):
+        serializer_class = type(self)
+        if serializer_class not in self._fields_cache:
+            self._fields_cache[serializer_class] = super().get_fields()
+        return {
+            field_name: (
+                deepcopy(field)
+                if isinstance(field, NESTED_FIELD_CLASSES)
+                else copy(field)
+            )
+            for field_name, field
+            in self._fields_cache[serializer_class].items()
+        }
+
+
+class UserStateAnnotationMixin:
+    """Добавляет к рецептам флаги избранного и списка покупок.
+
+    Флаги вычисляются подзапросами Exists в том же запросе, что и рецепты.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_favorited=Exists(
+                    Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+                ),
+                is_in_shopping_cart=Exists(
+                    ShoppingCart.objects.filter(
+                        user=user,
+                        recipe=OuterRef('pk')
+                    )
+                )
+            )
+        return queryset
@@ -1,9 +1,99 @@
+import hashlib
+from functools import partial
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
 
-from api.constants import PAGINATION_MAX_PAGE_SIZE, PAGINATION_PAGE_SIZE
+from api.constants import (
+    PAGINATION_COUNT_CACHE_TIMEOUT,
+    PAGINATION_MAX_PAGE_SIZE,
+    PAGINATION_PAGE_SIZE
+)
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, берущий количество объектов из кэша.
+
+    Закэшированное количество только подсказка: если выборка страницы
+    с ним не сходится, количество пересчитывается, поэтому устаревшее
+    значение не обрезает страницу и не прячет следующую.
+    """
+
+    def __init__(self, *args, cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        count = None
+        if self.cache_key is not None:
+            count = cache.get(self.cache_key)
+        if count is None:
+            count = self.refresh_count()
+        return count
+
+    def refresh_count(self):
+        self.__dict__.pop('num_pages', None)
+        count = super().count
+        if self.cache_key is not None:
+            cache.set(self.cache_key, count, PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def page(self, number):
+        if self.cache_key is None:
+            return super().page(number)
+
+        try:
+            number = self.validate_number(number)
+        except EmptyPage:
+            self.refresh_count()
+            number = self.validate_number(number)
+
+        bottom = (number - 1) * self.per_page
+        object_list = list(
+            self.object_list[bottom:bottom + self.per_page + 1]
+        )
+        if len(object_list) != min(self.count - bottom, self.per_page + 1):
+            self.refresh_count()
+            number = self.validate_number(number)
+
+        return self._get_page(object_list[:self.per_page], number, self)
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = PAGINATION_PAGE_SIZE
     page_size_query_param = 'limit'
     max_page_size = PAGINATION_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            cache_key=self.get_count_cache_key(request, view)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def is_count_cacheable(self, request, view):
+        """Количество, зависящее от действий пользователя, не кэшируется."""
+        if view is None:
+            return True
+        uncached_actions = getattr(view, 'uncached_count_actions', ())
+        if getattr(view, 'action', None) in uncached_actions:
+            return False
+        return not any(
+            param in request.query_params
+            for param in getattr(view, 'uncached_count_params', ())
+        )
+
+    def get_count_cache_key(self, request, view=None):
+        """Ключ кэша количества объектов для текущих фильтров."""
+        if not self.is_count_cacheable(request, view):
+            return None
+        filters = sorted(
+            (param, sorted(values))
+            for param, values in request.query_params.lists()
+            if param not in (self.page_query_param, self.page_size_query_param)
+        )
+        key = repr((request.path, request.user.pk, filters))
+        return f'pagination-count:{hashlib.md5(key.encode()).hexdigest()}'
@@ -1,19 +1,23 @@
 from django.contrib.auth import password_validation
-from drf_extra_fields.fields import Base64ImageField
+from django.db import connection, IntegrityError, transaction
+from django.db.models import F
+from django.utils.functional import cached_property
 from rest_framework import serializers
 
+from api.cache import get_tags_by_ids
 from api.constants import (
     AMOUNT_MIN_VALUE,
     RECIPES_LIMIT_DEFAULT,
     RECIPES_LIMIT_MIN_VALUE
 )
+from api.fields import Base64ImageField
+from api.mixins import CachedFieldsSerializerMixin
 from api.validators import (
     validate_cooking_time,
     validate_image,
     validate_ingredients,
     validate_subscription,
-    validate_tags,
-    validate_username
+    validate_tags
 )
 from recipes.models import (
     Favorite,
@@ -46,9 +50,6 @@ class CustomUserCreateSerializer(serializers.ModelSerializer):
             'password': {'required': True, 'write_only': True},
         }
 
-    def validate_username(self, value):
-        return validate_username(value)
-
     def create(self, validated_data):
         user = CustomUser(**validated_data)
         user.set_password(validated_data['password'])
@@ -56,7 +57,10 @@ class CustomUserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class CustomUserSerializer(serializers.ModelSerializer):
+class CustomUserSerializer(
+    CachedFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     is_subscribed = serializers.SerializerMethodField('get_is_subscribed')
     avatar = Base64ImageField(required=False, allow_null=True)
 
@@ -75,11 +79,25 @@ class CustomUserSerializer(serializers.ModelSerializer):
             {'avatar': {'required': False}}
         )
 
-    def get_is_subscribed(self, obj):
+    @cached_property
+    def current_user(self):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return request.user.subscriptions.filter(author=obj).exists()
-        return False
+            return request.user
+        return None
+
+    def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+
+        if self.current_user is None:
+            return False
+
+        subscribed_ids = self.context.get('subscribed_ids')
+        if subscribed_ids is not None:
+            return obj.id in subscribed_ids
+
+        return Subscription.objects.subscribed(self.current_user, obj)
 
     def validate(self, attrs):
         if 'avatar' not in attrs or attrs['avatar'] is None:
@@ -116,29 +134,19 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        user = validated_data['user']
-        author = validated_data['author']
-
-        subscription = Subscription.objects.create(
-            user=user,
-            author=author
-        )
-
-        return subscription
+        try:
+            with transaction.atomic():
+                return Subscription.objects.create(
+                    user=validated_data['user'],
+                    author=validated_data['author']
+                )
+        except IntegrityError:
+            raise serializers.ValidationError({
+                'non_field_errors': ['Вы уже подписаны на этого пользователя.']
+            })
 
     def to_representation(self, instance):
-        request = self.context.get('request')
-        user = (
-            request.user
-            if request and request.user.is_authenticated
-            else None
-        )
         recipes_limit = self.context.get('recipes_limit')
-        if recipes_limit is not None:
-            try:
-                recipes_limit = int(recipes_limit)
-            except ValueError:
-                recipes_limit = RECIPES_LIMIT_DEFAULT
 
         representation = {
             'id': instance.author.id,
@@ -146,14 +154,11 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             'first_name': instance.author.first_name,
             'last_name': instance.author.last_name,
             'email': instance.author.email,
-            'is_subscribed': Subscription.objects.filter(
-                user=user,
-                author=instance.author
-            ).exists() if user else False,
+            'is_subscribed': True,
             'avatar': (
                 instance.author.avatar.url if instance.author.avatar else None
             ),
-            'recipes_count': instance.author.recipes.count(),
+            'recipes_count': instance.recipes_count,
             'recipes': [
                 {
                     'id': recipe.id,
@@ -161,7 +166,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
                     'image': recipe.image.url if recipe.image else None,
                     'cooking_time': recipe.cooking_time
                 }
-                for recipe in instance.author.recipes.all()[:recipes_limit]
+                for recipe in instance.author.limited_recipes[:recipes_limit]
             ]
         }
 
@@ -185,47 +190,58 @@ class ChangePasswordSerializer(serializers.Serializer):
         return data
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(
+    CachedFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     class Meta:
         model = Tag
         fields = ('id', 'name', 'slug')
         read_only_fields = ('id',)
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(
+    CachedFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     class Meta:
         model = Ingredient
         fields = ('id', 'name', 'measurement_unit')
         read_only_fields = ('id',)
 
 
-class RecipeIngredientSerializer(serializers.ModelSerializer):
-    ingredient = IngredientSerializer(read_only=True)
+class RecipeIngredientSerializer(
+    CachedFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
+    id = serializers.IntegerField(source='ingredient.id', read_only=True)
+    name = serializers.CharField(source='ingredient.name', read_only=True)
+    measurement_unit = serializers.CharField(
+        source='ingredient.measurement_unit',
+        read_only=True
+    )
 
     class Meta:
         model = RecipeIngredient
-        fields = ('ingredient', 'amount')
-
-    def to_representation(self, instance):
-        return {
-            'id': instance.ingredient.id,
-            'name': instance.ingredient.name,
-            'measurement_unit': instance.ingredient.measurement_unit,
-            'amount': instance.amount
-        }
+        fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(
+    CachedFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     author = CustomUserSerializer(read_only=True)
-    tags = TagSerializer(many=True, read_only=True)
+    tags = serializers.SerializerMethodField('get_tags')
     ingredients = RecipeIngredientSerializer(
         many=True,
         source='recipeingredient_set'
     )
-    is_favorited = serializers.SerializerMethodField('get_is_favorited')
-    is_in_shopping_cart = serializers.SerializerMethodField(
-        'get_is_in_shopping_cart'
+    is_favorited = serializers.BooleanField(read_only=True, default=False)
+    is_in_shopping_cart = serializers.BooleanField(
+        read_only=True,
+        default=False
     )
+    image = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -242,48 +258,61 @@ class RecipeSerializer(serializers.ModelSerializer):
             'cooking_time'
         )
 
-    def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.favorited_by.filter(user=request.user).exists()
-        return False
+    def get_tags(self, obj):
+        return get_tags_by_ids([tag.id for tag in obj.tags.all()])
+
+    def get_image(self, obj):
+        return obj.image.url if obj.image else None
 
-    def get_is_in_shopping_cart(self, obj):
+
+class FastRecipeListSerializer(serializers.Serializer):
+    """Сериализатор списка рецептов без построения полей ModelSerializer.
+
+    Отдаёт ту же структуру, что и RecipeSerializer.
+    """
+
+    def file_url(self, file):
+        if not file:
+            return None
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.in_cart_by.filter(user=request.user).exists()
-        return False
+        if request is not None:
+            return request.build_absolute_uri(file.url)
+        return file.url
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation['id'] = instance.id
-        representation['is_favorited'] = self.get_is_favorited(instance)
-        representation['is_in_shopping_cart'] = (
-            self.get_is_in_shopping_cart(
-                instance
-            )
-        )
-        representation['tags'] = TagSerializer(
-            instance.tags.all(),
-            many=True
-        ).data
-        representation['ingredients'] = [
-            {
-                'id': ri.ingredient.id,
-                'name': ri.ingredient.name,
-                'measurement_unit': ri.ingredient.measurement_unit,
-                'amount': ri.amount,
-            }
-            for ri in instance.recipeingredient_set.all()
-        ]
-        representation['name'] = instance.name
-        representation['image'] = (
-            instance.image.url if instance.image else None
-        )
-        representation['text'] = instance.text
-        representation['cooking_time'] = instance.cooking_time
+    def to_representation(self, obj):
+        author = obj.author
+        subscribed_ids = self.context.get('subscribed_ids', ())
 
-        return representation
+        return {
+            'id': obj.id,
+            'tags': get_tags_by_ids([tag.id for tag in obj.tags.all()]),
+            'author': {
+                'email': author.email,
+                'id': author.id,
+                'username': author.username,
+                'first_name': author.first_name,
+                'last_name': author.last_name,
+                'is_subscribed': author.id in subscribed_ids,
+                'avatar': self.file_url(author.avatar)
+            },
+            'ingredients': [
+                {
+                    'id': recipe_ingredient.ingredient.id,
+                    'name': recipe_ingredient.ingredient.name,
+                    'measurement_unit': (
+                        recipe_ingredient.ingredient.measurement_unit
+                    ),
+                    'amount': recipe_ingredient.amount
+                }
+                for recipe_ingredient in obj.recipeingredient_set.all()
+            ],
+            'is_favorited': getattr(obj, 'is_favorited', False),
+            'is_in_shopping_cart': getattr(obj, 'is_in_shopping_cart', False),
+            'name': obj.name,
+            'image': obj.image.url if obj.image else None,
+            'text': obj.text,
+            'cooking_time': obj.cooking_time
+        }
 
 
 class IngredientIdAmountSerializer(serializers.Serializer):
@@ -291,45 +320,28 @@ class IngredientIdAmountSerializer(serializers.Serializer):
     amount = serializers.IntegerField(min_value=AMOUNT_MIN_VALUE)
 
 
-class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
-    author = CustomUserSerializer(read_only=True)
+class RecipeCreateUpdateSerializer(
+    CachedFieldsSerializerMixin,
+    serializers.ModelSerializer
+):
     ingredients = IngredientIdAmountSerializer(many=True, write_only=True)
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True,
-        queryset=Tag.objects.all(),
+    tags = serializers.ListField(
+        child=serializers.IntegerField(),
         write_only=True
     )
     image = Base64ImageField(write_only=True)
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
         fields = (
-            'id',
             'tags',
-            'author',
             'ingredients',
-            'is_favorited',
-            'is_in_shopping_cart',
             'name',
             'image',
             'text',
             'cooking_time'
         )
 
-    def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.favorited_by.filter(user=request.user).exists()
-        return False
-
-    def get_is_in_shopping_cart(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.in_cart_by.filter(user=request.user).exists()
-        return False
-
     def validate_cooking_time(self, value):
         return validate_cooking_time(value)
 
@@ -342,37 +354,56 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
     def validate_image(self, image):
         return validate_image(image)
 
-    def create(self, validated_data):
-        ingredients_data = validated_data.pop('ingredients', [])
-        tags_data = validated_data.pop('tags', [])
+    def validate(self, attrs):
+        if 'ingredients' not in attrs:
+            raise serializers.ValidationError({
+                'ingredients': (
+                    'Необходимо предоставить хотя бы один ингредиент.'
+                )
+            })
+        if 'tags' not in attrs:
+            raise serializers.ValidationError({
+                'tags': 'Необходимо предоставить хотя бы один тег.'
+            })
+        return attrs
 
-        validate_ingredients(ingredients_data)
-        validate_tags(tags_data)
+    def set_ingredients(self, recipe, ingredients_data):
+        try:
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe=recipe,
+                    ingredient_id=ingredient_data['id'],
+                    amount=ingredient_data['amount']
+                )
+                for ingredient_data in ingredients_data
+            )
+            connection.check_constraints(
+                table_names=(RecipeIngredient._meta.db_table,)
+            )
+        except IntegrityError:
+            raise serializers.ValidationError(
+                'Некоторые из указанных ингредиентов не существуют.'
+            )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        ingredients_data = validated_data.pop('ingredients')
+        tags_data = validated_data.pop('tags')
 
         validated_data['author'] = self.context.get('request').user
 
         recipe = Recipe.objects.create(**validated_data)
 
-        for ingredient_data in ingredients_data:
-            ingredient_id = ingredient_data.get('id')
-            amount = ingredient_data.get('amount')
-            ingredient = Ingredient.objects.get(id=ingredient_id)
-            RecipeIngredient.objects.create(
-                recipe=recipe,
-                ingredient=ingredient,
-                amount=amount
-            )
+        self.set_ingredients(recipe, ingredients_data)
 
         recipe.tags.set(tags_data)
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        ingredients_data = validated_data.pop('ingredients', [])
-        tags_data = validated_data.pop('tags', [])
-
-        validate_ingredients(ingredients_data)
-        validate_tags(tags_data)
+        ingredients_data = validated_data.pop('ingredients')
+        tags_data = validated_data.pop('tags')
 
         instance.name = validated_data.get('name', instance.name)
         instance.text = validated_data.get('text', instance.text)
@@ -383,70 +414,37 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
         )
         instance.save()
 
-        instance.ingredients.clear()
-
-        for ingredient_data in ingredients_data:
-            ingredient_id = ingredient_data.get('id')
-            amount = ingredient_data.get('amount')
-            ingredient = Ingredient.objects.get(id=ingredient_id)
-            RecipeIngredient.objects.create(
-                recipe=instance,
-                ingredient=ingredient,
-                amount=amount
-            )
+        RecipeIngredient.objects.filter(recipe=instance).delete()
+        self.set_ingredients(instance, ingredients_data)
 
         instance.tags.set(tags_data)
 
         return instance
 
     def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation['id'] = instance.id
-        representation['is_favorited'] = self.get_is_favorited(instance)
-        representation['is_in_shopping_cart'] = (
-            self.get_is_in_shopping_cart(
-                instance
-            )
-        )
-        representation['tags'] = TagSerializer(
-            instance.tags.all(),
-            many=True
-        ).data
-        representation['ingredients'] = [
-            {
-                'id': ri.ingredient.id,
-                'name': ri.ingredient.name,
-                'measurement_unit': ri.ingredient.measurement_unit,
-                'amount': ri.amount,
-            }
-            for ri in instance.recipeingredient_set.all()
-        ]
-        representation['name'] = instance.name
-        representation['image'] = (
-            instance.image.url if instance.image else None
-        )
-        representation['text'] = instance.text
-        representation['cooking_time'] = instance.cooking_time
-
-        return representation
+        return RecipeSerializer(instance, context=self.context).data
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
-    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
+    recipe = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = Favorite
         fields = ('recipe',)
 
     def create(self, validated_data):
-        user = self.context['request'].user
-        validated_data['user'] = user
-        favorite, created = Favorite.objects.get_or_create(**validated_data)
-        if not created:
+        validated_data['user'] = self.context['request'].user
+        try:
+            with transaction.atomic():
+                favorite = Favorite.objects.create(**validated_data)
+                Recipe.objects.filter(pk=favorite.recipe_id).update(
+                    favorites_count=F('favorites_count') + 1
+                )
+                return favorite
+        except IntegrityError:
             raise serializers.ValidationError(
                 'Этот рецепт уже добавлен в избранное.'
             )
-        return favorite
 
     def to_representation(self, instance):
         return {
@@ -458,23 +456,21 @@ class FavoriteSerializer(serializers.ModelSerializer):
 
 
 class ShoppingCartSerializer(serializers.ModelSerializer):
-    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
+    recipe = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = ShoppingCart
         fields = ('recipe',)
 
     def create(self, validated_data):
-        user = self.context['request'].user
-        validated_data['user'] = user
-        shopping_cart, created = ShoppingCart.objects.get_or_create(
-            **validated_data
-        )
-        if not created:
+        validated_data['user'] = self.context['request'].user
+        try:
+            with transaction.atomic():
+                return ShoppingCart.objects.create(**validated_data)
+        except IntegrityError:
             raise serializers.ValidationError(
                 'Этот рецепт уже добавлен в список покупок.'
             )
-        return shopping_cart
 
     def to_representation(self, instance):
         return {
@@ -1,73 +1,42 @@
-import re
-
 from rest_framework import serializers
 
 from api.constants import (
     AMOUNT_MIN_VALUE,
     COOKING_TIME_MIN_VALUE,
-    PAGINATION_MAX_PAGE_SIZE,
-    USERNAME_REGEX
+    PAGINATION_MAX_PAGE_SIZE
 )
+from recipes.models import Ingredient, Tag
 
-
-def validate_username(value):
-    if not re.match(USERNAME_REGEX, value):
-        raise serializers.ValidationError(
-            'Имя пользователя может содержать только буквы, '
-            'цифры и символы . @ + - _'
-        )
-    return value
+RECIPES_LIMIT_MAX_MESSAGE = (
+    f'Максимальное значение recipes_limit - {PAGINATION_MAX_PAGE_SIZE}.'
+)
+COOKING_TIME_MIN_MESSAGE = (
+    'Время приготовления должно быть не менее '
+    f'{COOKING_TIME_MIN_VALUE} минут(ы).'
+)
 
 
 def validate_subscription(user, author, recipes_limit):
-    from users.models import Subscription
-
     if user == author:
         raise serializers.ValidationError('Нельзя подписаться на себя.')
 
-    if Subscription.objects.filter(user=user, author=author).exists():
-        raise serializers.ValidationError(
-            'Вы уже подписаны на этого пользователя.'
-        )
-
     if recipes_limit > PAGINATION_MAX_PAGE_SIZE:
-        raise serializers.ValidationError(
-            f'Максимальное значение recipes_limit - '
-            f'{PAGINATION_MAX_PAGE_SIZE}.'
-        )
+        raise serializers.ValidationError(RECIPES_LIMIT_MAX_MESSAGE)
 
 
 def validate_cooking_time(value):
     if value < COOKING_TIME_MIN_VALUE:
-        raise serializers.ValidationError(
-            'Время приготовления должно быть не менее '
-            f'{COOKING_TIME_MIN_VALUE} минут(ы).'
-        )
+        raise serializers.ValidationError(COOKING_TIME_MIN_MESSAGE)
     return value
 
 
 def validate_ingredients(ingredients_data):
-    from recipes.models import Ingredient
-
     if not ingredients_data:
         raise serializers.ValidationError(
             'Необходимо предоставить хотя бы один ингредиент.'
         )
 
     unique_ids = set()
-    ingredient_ids = [ingredient.get('id') for ingredient in ingredients_data]
-
-    existing_ingredients = Ingredient.objects.filter(id__in=ingredient_ids)
-
-    if len(existing_ingredients) != len(ingredient_ids):
-        missing_ids = set(ingredient_ids) - set(
-            existing_ingredients.values_list('id', flat=True)
-        )
-        raise serializers.ValidationError(
-            f'Ингредиенты с id {", ".join(map(str, missing_ids))} '
-            'не существуют.'
-        )
-
     for ingredient in ingredients_data:
         ingredient_id = ingredient.get('id')
 
@@ -83,6 +52,19 @@ def validate_ingredients(ingredients_data):
                 'Ингредиент должен иметь положительное количество.'
             )
 
+    existing_ids = set(
+        Ingredient.objects.filter(id__in=unique_ids).values_list(
+            'id',
+            flat=True
+        )
+    )
+    if len(existing_ids) != len(unique_ids):
+        missing_ids = unique_ids - existing_ids
+        raise serializers.ValidationError(
+            f'Ингредиенты с id {", ".join(map(str, missing_ids))} '
+            'не существуют.'
+        )
+
     return ingredients_data
 
 
@@ -92,9 +74,20 @@ def validate_tags(tags_data):
             'Необходимо предоставить хотя бы один тег.'
         )
 
-    if len(tags_data) != len(set(tags_data)):
+    unique_ids = set()
+    for tag_id in tags_data:
+        if tag_id in unique_ids:
+            raise serializers.ValidationError(
+                'Дублирование тегов не допускается.'
+            )
+        unique_ids.add(tag_id)
+
+    existing_tags = Tag.objects.in_bulk(tags_data)
+
+    if len(existing_tags) != len(unique_ids):
+        missing_ids = unique_ids - existing_tags.keys()
         raise serializers.ValidationError(
-            'Дублирование тегов не допускается.'
+            f'Теги с id {", ".join(map(str, missing_ids))} не существуют.'
         )
 
     return tags_data
@@ -1,22 +1,41 @@
-import hashlib
-from collections import defaultdict
-
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    IntegerField,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    Sum,
+    When
+)
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from api.constants import RECIPES_LIMIT_DEFAULT, UNIQUE_ID_LENGTH
+from api.cache import get_tags_dict
+from api.constants import (
+    PAGINATION_MAX_PAGE_SIZE,
+    RECIPES_LIMIT_DEFAULT,
+    RECIPES_LIMIT_MIN_VALUE,
+    SHOPPING_LIST_CHUNK_SIZE
+)
+from api.fields import Base64ImageField
 from api.filters import RecipeFilter
+from api.mixins import UserStateAnnotationMixin
 from api.paginators import CustomPageNumberPagination
 from api.permissions import IsAdminUserOrReadOnly, IsAuthorOrReadOnly
 from api.serializers import (
     ChangePasswordSerializer,
     CustomUserCreateSerializer,
     CustomUserSerializer,
+    FastRecipeListSerializer,
     FavoriteSerializer,
     IngredientSerializer,
     RecipeCreateUpdateSerializer,
@@ -25,7 +44,14 @@ from api.serializers import (
     SubscriptionSerializer,
     TagSerializer
 )
-from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag
+)
 from users.models import CustomUser, Subscription
 
 
@@ -38,11 +64,15 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
         queryset = super().get_queryset()
         name = self.request.query_params.get('name', None)
         if name:
-            queryset = queryset.filter(name__istartswith=name)
-            queryset = queryset | Ingredient.objects.filter(
-                name__icontains=name
+            queryset = queryset.filter(name__icontains=name).order_by(
+                Case(
+                    When(name__istartswith=name, then=0),
+                    default=1,
+                    output_field=IntegerField()
+                ),
+                'name'
             )
-        return queryset.distinct()
+        return queryset
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -56,21 +86,65 @@ class TagViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAdminUserOrReadOnly,)
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(list(get_tags_dict().values()))
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(UserStateAnnotationMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     pagination_class = CustomPageNumberPagination
+    uncached_count_params = ('author', 'is_favorited', 'is_in_shopping_cart')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
 
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related(
+            'author'
+        ).prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.only('id')),
+            Prefetch(
+                'recipeingredient_set',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'
+                ).only(
+                    'id',
+                    'amount',
+                    'recipe_id',
+                    'ingredient__id',
+                    'ingredient__name',
+                    'ingredient__measurement_unit'
+                )
+            )
+        )
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(
+                'id',
+                'name',
+                'image',
+                'text',
+                'cooking_time',
+                'author__id',
+                'author__email',
+                'author__username',
+                'author__first_name',
+                'author__last_name',
+                'author__avatar'
+            )
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        user = self.request.user
+        context['subscribed_ids'] = set(
+            user.subscriptions.values_list('author_id', flat=True)
+        ) if user.is_authenticated else set()
+        return context
+
     def get_serializer_class(self):
         if self.action in ('create', 'update', 'partial_update'):
             return RecipeCreateUpdateSerializer
-        elif self.action in ('list', 'retrieve'):
+        elif self.action == 'list':
+            return FastRecipeListSerializer
+        elif self.action == 'retrieve':
             return RecipeSerializer
 
     def get_permissions(self):
@@ -98,6 +172,10 @@ class RecipeViewSet(viewsets.ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+
+        if getattr(instance, '_prefetched_objects_cache', None):
+            instance._prefetched_objects_cache = {}
+
         return Response(serializer.data)
 
     @action(
@@ -107,15 +185,10 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.AllowAny,)
     )
     def get_link(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-
-        unique_string = f'{recipe.id}-{recipe.pub_date.isoformat()}'
-        unique_id = hashlib.md5(
-            unique_string.encode()
-        ).hexdigest()[:UNIQUE_ID_LENGTH]
+        recipe = get_object_or_404(Recipe.objects.only('short_code'), pk=pk)
 
         domain = request.build_absolute_uri('/')[:-1]
-        link = f'{domain}/recipes/s/{unique_id}/'
+        link = f'{domain}/recipes/s/{recipe.short_code}/'
 
         return Response({'short-link': link}, status=status.HTTP_200_OK)
 
@@ -126,31 +199,30 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated, IsAuthorOrReadOnly)
     )
     def download_shopping_cart(self, request):
-        user = request.user
-        shopping_cart_items = ShoppingCart.objects.filter(user=user)
-        ingredients = defaultdict(lambda: {'amount': 0, 'unit': None})
-
-        for item in shopping_cart_items:
-            recipe = item.recipe
-            for recipe_ingredient in recipe.recipeingredient_set.all():
-                ingredient = recipe_ingredient.ingredient
-                ingredients[ingredient.name]['amount'] += (
-                    recipe_ingredient.amount
+        ingredients = RecipeIngredient.objects.filter(
+            recipe__in_cart_by__user=request.user
+        ).values(
+            'ingredient__name',
+            'ingredient__measurement_unit'
+        ).annotate(
+            total_amount=Sum('amount')
+        ).order_by('ingredient__name')
+
+        def shopping_list():
+            yield 'Список покупок:\n'
+            for ingredient in ingredients.iterator(
+                chunk_size=SHOPPING_LIST_CHUNK_SIZE
+            ):
+                yield (
+                    f'{ingredient["ingredient__name"]} — '
+                    f'{ingredient["total_amount"]} '
+                    f'{ingredient["ingredient__measurement_unit"]}\n'
                 )
-                if ingredients[ingredient.name]['unit'] is None:
-                    ingredients[ingredient.name]['unit'] = (
-                        ingredient.measurement_unit
-                    )
 
-        response_content = 'Список покупок:\n'
-        for ingredient_name, data in ingredients.items():
-            total_amount = data['amount']
-            measurement_unit = data['unit']
-            response_content += (
-                f'{ingredient_name} — {total_amount} {measurement_unit}\n'
-            )
-
-        response = HttpResponse(response_content, content_type='text/plain')
+        response = StreamingHttpResponse(
+            shopping_list(),
+            content_type='text/plain; charset=utf-8'
+        )
         response['Content-Disposition'] = (
             'attachment; filename="shopping_cart.txt"'
         )
@@ -163,32 +235,36 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated, IsAuthorOrReadOnly)
     )
     def favorite(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-
         if request.method == 'POST':
+            recipe = get_object_or_404(
+                Recipe.objects.only('id', 'name', 'image', 'cooking_time'),
+                pk=pk
+            )
             serializer = FavoriteSerializer(
-                data={'recipe': recipe.id},
+                data={},
                 context={'request': request}
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            serializer.save(recipe=recipe)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        elif request.method == 'DELETE':
-            try:
-                favorite_item = Favorite.objects.get(
-                    user=request.user,
-                    recipe=recipe
-                )
-                favorite_item.delete()
-                return Response(status=status.HTTP_204_NO_CONTENT)
-            except Favorite.DoesNotExist:
-                return Response(
-                    {'detail': 'Этот рецепт не в избранном.'},
-                    status=status.HTTP_400_BAD_REQUEST
+        with transaction.atomic():
+            deleted, _ = Favorite.objects.filter(
+                user=request.user,
+                recipe_id=pk
+            ).delete()
+            if deleted:
+                Recipe.objects.filter(pk=pk, favorites_count__gt=0).update(
+                    favorites_count=F('favorites_count') - 1
                 )
+        if deleted:
+            return Response(status=status.HTTP_204_NO_CONTENT)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        get_object_or_404(Recipe.objects.only('id'), pk=pk)
+        return Response(
+            {'detail': 'Этот рецепт не в избранном.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
     @action(
         detail=True,
@@ -197,43 +273,74 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated, IsAuthorOrReadOnly)
     )
     def shopping_cart(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-
         if request.method == 'POST':
+            recipe = get_object_or_404(
+                Recipe.objects.only('id', 'name', 'image', 'cooking_time'),
+                pk=pk
+            )
             serializer = ShoppingCartSerializer(
-                data={'recipe': recipe.id},
+                data={},
                 context={'request': request}
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            serializer.save(recipe=recipe)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        elif request.method == 'DELETE':
-            try:
-                shopping_item = ShoppingCart.objects.get(
-                    user=request.user,
-                    recipe=recipe
-                )
-                shopping_item.delete()
-                return Response(status=status.HTTP_204_NO_CONTENT)
-            except ShoppingCart.DoesNotExist:
-                return Response(
-                    {'detail': 'Этот рецепт не в списке покупок.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        deleted, _ = ShoppingCart.objects.filter(
+            user=request.user,
+            recipe_id=pk
+        ).delete()
+        if deleted:
+            return Response(status=status.HTTP_204_NO_CONTENT)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        get_object_or_404(Recipe.objects.only('id'), pk=pk)
+        return Response(
+            {'detail': 'Этот рецепт не в списке покупок.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
 
 class CustomUserViewSet(viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     pagination_class = CustomPageNumberPagination
+    uncached_count_actions = ('subscriptions',)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_subscribed=Exists(
+                    Subscription.objects.filter(
+                        user=user,
+                        author=OuterRef('pk')
+                    )
+                )
+            )
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.defer(
+                'password',
+                'last_login',
+                'is_superuser',
+                'is_staff',
+                'is_active',
+                'date_joined'
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('create',):
             return CustomUserCreateSerializer
         return CustomUserSerializer
 
+    def perform_destroy(self, instance):
+        recipe_ids = list(
+            instance.favorites.values_list('recipe_id', flat=True)
+        )
+        with transaction.atomic():
+            instance.delete()
+            Recipe.refresh_favorites_count(recipe_ids)
+
     def list(self, request):
         queryset = self.get_queryset()
         page = self.paginate_queryset(queryset)
@@ -250,6 +357,51 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def get_recipes_limit(self):
+        """Лимит рецептов в подписке из параметра recipes_limit.
+
+        Некорректные и слишком маленькие значения заменяются значением
+        по умолчанию, слишком большие ограничиваются максимумом.
+        """
+        try:
+            recipes_limit = int(self.request.query_params.get(
+                'recipes_limit',
+                RECIPES_LIMIT_DEFAULT
+            ))
+        except ValueError:
+            return RECIPES_LIMIT_DEFAULT
+        if recipes_limit < RECIPES_LIMIT_MIN_VALUE:
+            return RECIPES_LIMIT_DEFAULT
+        return min(recipes_limit, PAGINATION_MAX_PAGE_SIZE)
+
+    def get_subscriptions_queryset(self):
+        return self.request.user.subscriptions.select_related(
+            'author'
+        ).annotate(
+            recipes_count=Coalesce(
+                Subquery(
+                    Recipe.objects.filter(
+                        author=OuterRef('author')
+                    ).order_by().values('author').annotate(
+                        count=Count('pk')
+                    ).values('count')
+                ),
+                0
+            )
+        ).prefetch_related(
+            Prefetch(
+                'author__recipes',
+                queryset=Recipe.objects.only(
+                    'id',
+                    'name',
+                    'image',
+                    'cooking_time',
+                    'author_id'
+                ).order_by('-pub_date'),
+                to_attr='limited_recipes'
+            )
+        )
+
     @action(
         detail=False,
         methods=('get',),
@@ -267,7 +419,7 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated,)
     )
     def avatar(self, request):
-        user = get_object_or_404(CustomUser, pk=request.user.pk)
+        user = request.user
 
         if request.method == 'PUT':
             avatar_serializer = CustomUserSerializer(
@@ -288,7 +440,7 @@ class CustomUserViewSet(viewsets.ModelViewSet):
             if user.avatar:
                 user.avatar.delete(save=False)
                 user.avatar = None
-                user.save()
+                user.save(update_fields=('avatar',))
                 return Response(status=status.HTTP_204_NO_CONTENT)
 
             return Response(
@@ -320,25 +472,25 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated,)
     )
     def subscriptions(self, request):
-        subscriptions = request.user.subscriptions.all()
-        recipes_limit = request.query_params.get(
-            'recipes_limit',
-            RECIPES_LIMIT_DEFAULT
-        )
+        subscriptions = self.get_subscriptions_queryset()
+        context = {
+            'recipes_limit': self.get_recipes_limit(),
+            'request': request
+        }
 
         page = self.paginate_queryset(subscriptions)
         if page is not None:
             serializer = SubscriptionSerializer(
                 page,
                 many=True,
-                context={'recipes_limit': recipes_limit, 'request': request}
+                context=context
             )
             return self.get_paginated_response(serializer.data)
 
         serializer = SubscriptionSerializer(
             subscriptions,
             many=True,
-            context={'recipes_limit': recipes_limit, 'request': request}
+            context=context
         )
         return Response(serializer.data)
 
@@ -352,10 +504,6 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         author = get_object_or_404(CustomUser, pk=pk)
 
         if request.method == 'POST':
-            recipes_limit = request.query_params.get(
-                'recipes_limit',
-                RECIPES_LIMIT_DEFAULT
-            )
             subscription_data = {
                 'user': request.user.id,
                 'author': author.id
@@ -363,23 +511,25 @@ class CustomUserViewSet(viewsets.ModelViewSet):
 
             subscription_serializer = SubscriptionSerializer(
                 data=subscription_data,
-                context={'recipes_limit': recipes_limit}
+                context={'recipes_limit': self.get_recipes_limit()}
             )
             subscription_serializer.is_valid(raise_exception=True)
             subscription = subscription_serializer.save()
+            subscription_serializer.instance = (
+                self.get_subscriptions_queryset().get(pk=subscription.pk)
+            )
             return Response(
                 subscription_serializer.data,
                 status=status.HTTP_201_CREATED
             )
 
         elif request.method == 'DELETE':
-            subscription = Subscription.objects.filter(
+            deleted, _ = Subscription.objects.filter(
                 user=request.user,
                 author=author
-            ).first()
+            ).delete()
 
-            if subscription:
-                subscription.delete()
+            if deleted:
                 return Response(status=status.HTTP_204_NO_CONTENT)
 
             return Response(
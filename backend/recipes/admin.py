@@ -1,6 +1,11 @@
 from django.contrib import admin
+from django.db import transaction
 
-from recipes.forms import IngredientInlineForm, RecipeForm
+from recipes.forms import (
+    IngredientInlineForm,
+    IngredientInlineFormSet,
+    RecipeForm
+)
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -14,6 +19,7 @@ from recipes.models import (
 class IngredientInline(admin.TabularInline):
     model = RecipeIngredient
     form = IngredientInlineForm
+    formset = IngredientInlineFormSet
     extra = 1
 
 
@@ -34,25 +40,51 @@ class RecipeAdmin(admin.ModelAdmin):
     form = RecipeForm
     inlines = (IngredientInline,)
     list_display = ('name', 'author', 'get_favorites_count')
+    list_select_related = ('author',)
+    raw_id_fields = ('author',)
     search_fields = ('name', 'author__username')
     list_filter = ('tags',)
 
     def get_favorites_count(self, obj):
-        return obj.favorited_by.count()
+        return obj.favorites_count
     get_favorites_count.short_description = 'Количество добавлений в избранное'
 
 
 @admin.register(RecipeIngredient)
 class RecipeIngredientAdmin(admin.ModelAdmin):
     list_display = ('recipe', 'ingredient', 'amount')
+    list_select_related = ('recipe', 'ingredient')
     search_fields = ('recipe__name', 'ingredient__name')
 
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
+    raw_id_fields = ('user', 'recipe')
+
+    def save_model(self, request, obj, form, change):
+        recipe_ids = {obj.recipe_id, form.initial.get('recipe')}
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            Recipe.refresh_favorites_count(recipe_ids - {None})
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            Recipe.refresh_favorites_count((obj.recipe_id,))
+
+    def delete_queryset(self, request, queryset):
+        recipe_ids = list(
+            queryset.values_list('recipe_id', flat=True).distinct()
+        )
+        with transaction.atomic():
+            super().delete_queryset(request, queryset)
+            Recipe.refresh_favorites_count(recipe_ids)
 
 
 @admin.register(ShoppingCart)
 class ShoppingCartAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
+    raw_id_fields = ('user', 'recipe')
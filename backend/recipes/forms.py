@@ -1,7 +1,7 @@
 from django import forms
 
 from api.constants import AMOUNT_MIN_VALUE, COOKING_TIME_MIN_VALUE
-from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.models import Recipe, RecipeIngredient
 
 
 class RecipeForm(forms.ModelForm):
@@ -74,22 +74,6 @@ class IngredientInlineForm(forms.ModelForm):
                 'Необходимо предоставить хотя бы один ингредиент.'
             )
 
-        if not Ingredient.objects.filter(id=ingredient.id).exists():
-            raise forms.ValidationError(
-                f'Ингредиент с id {ingredient.id} не существует.'
-            )
-
-        recipe = self.instance.recipe if self.instance.pk else None
-
-        if recipe:
-            existing_ingredients = recipe.recipeingredient_set.exclude(
-                pk=self.instance.pk
-            )
-            if existing_ingredients.filter(ingredient=ingredient).exists():
-                raise forms.ValidationError(
-                    'Дублирование ингредиентов не допускается.'
-                )
-
         return ingredient
 
     def clean_amount(self):
@@ -113,3 +97,25 @@ class IngredientInlineForm(forms.ModelForm):
             raise forms.ValidationError('Это поле обязательно для заполнения.')
 
         return cleaned_data
+
+
+class IngredientInlineFormSet(forms.BaseInlineFormSet):
+    def clean(self):
+        """Проверка дублирования ингредиентов по всем строкам рецепта."""
+        ingredient_ids = set()
+        for form in self.forms:
+            cleaned_data = getattr(form, 'cleaned_data', None)
+            if not cleaned_data or cleaned_data.get('DELETE'):
+                continue
+
+            ingredient = cleaned_data.get('ingredient')
+            if ingredient is None:
+                continue
+
+            if ingredient.id in ingredient_ids:
+                raise forms.ValidationError(
+                    'Дублирование ингредиентов не допускается.'
+                )
+            ingredient_ids.add(ingredient.id)
+
+        super().clean()
@@ -0,0 +1,21 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX ingredient_name_trgm_idx '
+                'ON recipes_ingredient '
+                'USING gin (UPPER(name::text) gin_trgm_ops);'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS ingredient_name_trgm_idx;',
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.3 on 2026-10-15 06:00
+
+import hashlib
+
+from django.db import migrations, models
+
+SHORT_CODE_LENGTH = 8
+
+
+def fill_short_codes(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    recipes = Recipe.objects.only('id', 'pub_date')
+    for recipe in recipes.iterator():
+        unique_string = f'{recipe.id}-{recipe.pub_date.isoformat()}'
+        recipe.short_code = hashlib.md5(
+            unique_string.encode()
+        ).hexdigest()[:SHORT_CODE_LENGTH]
+        recipe.save(update_fields=('short_code',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_pub_date_ingredient_name_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='short_code',
+            field=models.CharField(editable=False, max_length=8, null=True, unique=True, verbose_name='Код короткой ссылки'),
+        ),
+        migrations.RunPython(fill_short_codes, migrations.RunPython.noop),
+    ]
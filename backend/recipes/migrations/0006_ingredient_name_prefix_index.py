@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_recipe_short_code'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX ingredient_name_prefix_idx '
+                'ON recipes_ingredient '
+                '(UPPER(name::text) text_pattern_ops);'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS ingredient_name_prefix_idx;',
+        ),
+    ]
@@ -1,10 +1,17 @@
-from django.db import models
+import hashlib
+import secrets
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 from api.constants import (
     INGREDIENT_NAME_MAX_LENGTH,
     INGREDIENT_UNIT_MAX_LENGTH,
     RECIPE_MAX_LENGTH,
-    TAG_MAX_LENGTH
+    SHORT_CODE_MAX_ATTEMPTS,
+    TAG_MAX_LENGTH,
+    UNIQUE_ID_LENGTH
 )
 from users.models import CustomUser
 
@@ -44,7 +51,8 @@ class Ingredient(models.Model):
     name = models.CharField(
         max_length=INGREDIENT_NAME_MAX_LENGTH,
         verbose_name='Название',
-        blank=False
+        blank=False,
+        db_index=True
     )
     measurement_unit = models.CharField(
         max_length=INGREDIENT_UNIT_MAX_LENGTH,
@@ -109,12 +117,26 @@ class Recipe(models.Model):
     )
     pub_date = models.DateTimeField(
         verbose_name='Дата создания',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
     update_date = models.DateTimeField(
         verbose_name='Дата обновления',
         auto_now=True
     )
+    short_code = models.CharField(
+        max_length=UNIQUE_ID_LENGTH,
+        unique=True,
+        null=True,
+        editable=False,
+        verbose_name='Код короткой ссылки'
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        verbose_name='Количество добавлений в избранное'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
@@ -124,6 +146,52 @@ class Recipe(models.Model):
     def __str__(self):
         return f'Рецепт: {self.name}'
 
+    @classmethod
+    def refresh_favorites_count(cls, recipe_ids):
+        """Пересчитывает favorites_count рецептов по таблице избранного."""
+        cls.objects.filter(pk__in=recipe_ids).update(
+            favorites_count=Coalesce(
+                Subquery(
+                    Favorite.objects.filter(
+                        recipe=OuterRef('pk')
+                    ).order_by().values('recipe').annotate(
+                        count=Count('pk')
+                    ).values('count')
+                ),
+                0
+            )
+        )
+
+    def make_short_code(self):
+        unique_string = f'{self.author_id}-{self.name}'
+        return hashlib.blake2b(
+            unique_string.encode(),
+            digest_size=UNIQUE_ID_LENGTH // 2,
+            salt=secrets.token_bytes(hashlib.blake2b.SALT_SIZE)
+        ).hexdigest()
+
+    def save(self, *args, **kwargs):
+        """Сохраняет рецепт, при создании сразу заполняя short_code.
+
+        В хэш подмешивается случайная соль, поэтому при редком совпадении
+        с уже занятым кодом вставка повторяется с новым.
+        """
+        if self.short_code:
+            return super().save(*args, **kwargs)
+
+        for attempt in range(SHORT_CODE_MAX_ATTEMPTS):
+            self.short_code = self.make_short_code()
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                code_taken = Recipe.objects.filter(
+                    short_code=self.short_code
+                ).exists()
+                if not code_taken or attempt == SHORT_CODE_MAX_ATTEMPTS - 1:
+                    self.short_code = None
+                    raise
+
 
 class RecipeIngredient(models.Model):
     recipe = models.ForeignKey(
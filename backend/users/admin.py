@@ -1,21 +1,65 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
 
+from recipes.models import Favorite, Recipe
 from users.forms import CustomUserForm, SubscriptionForm
 from users.models import CustomUser, Subscription
 
 
+class OnlyFieldsChangeList(ChangeList):
+    def get_queryset(self, request):
+        return super().get_queryset(request).only(
+            *self.model_admin.list_only
+        )
+
+
+class ListOnlyMixin:
+    """Загружает в списке объектов только поля из list_only.
+
+    Формы изменения и удаления по-прежнему получают объект целиком.
+    """
+
+    list_only = ()
+
+    def get_changelist(self, request, **kwargs):
+        return OnlyFieldsChangeList
+
+
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(ListOnlyMixin, UserAdmin):
     form = CustomUserForm
     list_display = ('username', 'email', 'first_name', 'last_name')
+    list_only = ('id', 'username', 'email', 'first_name', 'last_name')
     search_fields = ('username', 'email')
     ordering = ('username',)
+    show_full_result_count = False
+
+    def delete_model(self, request, obj):
+        recipe_ids = list(obj.favorites.values_list('recipe_id', flat=True))
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            Recipe.refresh_favorites_count(recipe_ids)
+
+    def delete_queryset(self, request, queryset):
+        recipe_ids = list(
+            Favorite.objects.filter(user__in=queryset).values_list(
+                'recipe_id', flat=True
+            ).distinct()
+        )
+        with transaction.atomic():
+            super().delete_queryset(request, queryset)
+            Recipe.refresh_favorites_count(recipe_ids)
 
 
 @admin.register(Subscription)
-class SubscriptionAdmin(admin.ModelAdmin):
+class SubscriptionAdmin(ListOnlyMixin, admin.ModelAdmin):
     form = SubscriptionForm
     list_display = ('user', 'author')
+    list_only = ('id', 'user__username', 'author__username')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
     search_fields = ('user__username', 'author__username')
     ordering = ('user',)
+    show_full_result_count = False
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('recipes', '0003_ingredient_name_trgm_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX customuser_username_trgm_idx '
+                'ON users_customuser '
+                'USING gin (UPPER(username::text) gin_trgm_ops);'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS customuser_username_trgm_idx;',
+        ),
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX customuser_email_trgm_idx '
+                'ON users_customuser '
+                'USING gin (UPPER(email::text) gin_trgm_ops);'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS customuser_email_trgm_idx;',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.3 on 2026-10-15 06:05
+
+from django.db import migrations, models
+
+DEFAULT_AVATAR = 'avatar-icon.png'
+
+
+def clear_default_avatars(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    CustomUser.objects.filter(
+        avatar__in=(DEFAULT_AVATAR, '')
+    ).update(avatar=None)
+
+
+def restore_default_avatars(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    CustomUser.objects.filter(
+        avatar__isnull=True
+    ).update(avatar=DEFAULT_AVATAR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_subscription_author_user_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, upload_to='avatars/', verbose_name='Аватар'),
+        ),
+        migrations.RunPython(clear_default_avatars, restore_default_avatars),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.3 on 2026-10-15 06:05
+
+from django.db import migrations, models
+import django.db.models.functions.text
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_customuser_avatar_nullable'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', users.models.CustomUserManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='customuser_email_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.3 on 2026-10-15 06:06
+
+import django.contrib.auth.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_customuser_email_upper_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='username',
+            field=models.CharField(max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator(message='Имя пользователя может содержать только буквы, цифры и символы . @ + - _')]),
+        ),
+    ]
@@ -1,35 +1,57 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 
 from api.constants import CUSTOMUSER_MAX_LENGTH
 
 
+class CustomUserManager(UserManager):
+    def get_by_natural_key(self, username):
+        """Ищет пользователя по email без учёта регистра.
+
+        Поиск идёт по индексу UPPER(email). Если адреса различаются только
+        регистром, выбирается точное совпадение.
+        """
+        try:
+            return self.get(
+                **{f'{self.model.USERNAME_FIELD}__iexact': username}
+            )
+        except self.model.MultipleObjectsReturned:
+            return super().get_by_natural_key(username)
+
+
 class CustomUser(AbstractUser):
     first_name = models.CharField(
         max_length=CUSTOMUSER_MAX_LENGTH,
-        verbose_name='Имя',
-        blank=False
+        verbose_name='Имя'
     )
     last_name = models.CharField(
         max_length=CUSTOMUSER_MAX_LENGTH,
-        verbose_name='Фамилия',
-        blank=False
+        verbose_name='Фамилия'
     )
     username = models.CharField(
         max_length=CUSTOMUSER_MAX_LENGTH,
         unique=True,
-        blank=False
+        validators=(
+            UnicodeUsernameValidator(
+                message=(
+                    'Имя пользователя может содержать только буквы, '
+                    'цифры и символы . @ + - _'
+                )
+            ),
+        )
     )
     email = models.EmailField(
         unique=True,
-        verbose_name='Электронная почта',
-        blank=False
+        verbose_name='Электронная почта'
     )
     avatar = models.ImageField(
         upload_to='avatars/',
-        default='avatar-icon.png',
         verbose_name='Аватар',
-        blank=True
+        blank=True,
+        null=True
     )
     pub_date = models.DateTimeField(
         verbose_name='Дата создания',
@@ -44,12 +66,16 @@ class CustomUser(AbstractUser):
     REQUIRED_FIELDS = (
         'username',
         'first_name',
-        'last_name',
-        'password'
+        'last_name'
     )
 
+    objects = CustomUserManager()
+
     class Meta:
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(Upper('email'), name='customuser_email_upper_idx')
+        ]
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
 
@@ -57,6 +83,12 @@ class CustomUser(AbstractUser):
         return f'Пользователь: {self.username}'
 
 
+class SubscriptionQuerySet(models.QuerySet):
+    def subscribed(self, user, author):
+        """Проверяет подписку одним запросом по уникальному индексу."""
+        return self.filter(user_id=user.pk, author_id=author.pk).exists()
+
+
 class Subscription(models.Model):
     user = models.ForeignKey(
         CustomUser,
@@ -71,6 +103,8 @@ class Subscription(models.Model):
         verbose_name='Автор'
     )
 
+    objects = SubscriptionQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -78,8 +112,18 @@ class Subscription(models.Model):
                 name='unique_subscription'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['author', 'user'],
+                name='subscription_author_user_idx'
+            )
+        ]
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
 
     def __str__(self):
         return f'{self.user.username} подписан на {self.author.username}'
+
+    def clean(self):
+        if self.user_id is not None and self.user_id == self.author_id:
+            raise ValidationError({'author': 'Нельзя подписаться на себя.'})